@@ -2,6 +2,9 @@ import cv2
 import mediapipe as mp
 import vlc
 import time
+import threading
+import queue
+from collections import deque
 import numpy as np
 
 # --- Media Player Setup ---
@@ -18,6 +21,13 @@ class MediaPlayer:
         self.player = vlc.MediaPlayer(self.files[self.index])
         self.is_playing = False
         self.muted = False
+        # Cached for get_status, which runs every frame.
+        # libvlc reports -1 until audio output starts, so -1 means "not known yet".
+        self._volume = self.player.audio_get_volume()
+        self._track_name = self._get_track_name()
+
+    def _get_track_name(self):
+        return self.files[self.index].split("/")[-1]
 
     def play(self):
         if not self.is_playing:
@@ -46,6 +56,8 @@ class MediaPlayer:
         self.stop()
         self.index = (self.index + 1) % len(self.files)
         self.player = vlc.MediaPlayer(self.files[self.index])
+        self._track_name = self._get_track_name()
+        self._volume = -1
         self.play()
         print("Next track:", self.files[self.index])
 
@@ -53,6 +65,8 @@ class MediaPlayer:
         self.stop()
         self.index = (self.index - 1) % len(self.files)
         self.player = vlc.MediaPlayer(self.files[self.index])
+        self._track_name = self._get_track_name()
+        self._volume = -1
         self.play()
         print("Previous track:", self.files[self.index])
 
@@ -60,12 +74,14 @@ class MediaPlayer:
         vol = self.player.audio_get_volume()
         vol = min(vol + 10, 100)
         self.player.audio_set_volume(vol)
+        self._volume = vol
         print("Volume up:", vol)
 
     def volume_down(self):
         vol = self.player.audio_get_volume()
         vol = max(vol - 10, 0)
         self.player.audio_set_volume(vol)
+        self._volume = vol
         print("Volume down:", vol)
 
     def mute_unmute(self):
@@ -80,59 +96,110 @@ class MediaPlayer:
 
     def get_status(self):
         status = "Playing" if self.is_playing else "Paused"
-        vol = self.player.audio_get_volume()
-        track = self.files[self.index].split("/")[-1]
-        return f"{track} | {status} | Volume: {vol} | Muted: {self.muted}"
+        if self._volume < 0:
+            self._volume = self.player.audio_get_volume()
+        return f"{self._track_name} | {status} | Volume: {self._volume} | Muted: {self.muted}"
 
 # --- Hand Gesture Recognition ---
 
 mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-hands_detector = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.6)
+# Single user, so track one hand with the lite model
+hands_detector = mp_hands.Hands(
+    static_image_mode=False,
+    max_num_hands=1,
+    model_complexity=0,
+    min_detection_confidence=0.7,
+    min_tracking_confidence=0.6,
+)
+
+# Capture resolution requested from the camera, and the smaller size fed to MediaPipe.
+# Landmarks are normalized to [0, 1], so they map back onto the full frame unchanged.
+CAPTURE_SIZE = (640, 480)
+DETECTION_SIZE = (320, 240)
+
+# Opt-in: run the detection resize and color conversions through OpenCV's OpenCL
+# backend (T-API / UMat). Off by default: at 640x480 the upload/download and the
+# device sync in the motion gate usually cost more than they save, and CPU-only
+# OpenCL runtimes make it slower still. Only enable it after measuring.
+USE_OPENCL = False
+
+# Motion gate: skip hand detection when the frame barely changed
+MOTION_SIZE = (80, 60)  # downsampled grayscale size used for frame differencing
+MOTION_THRESHOLD = 2 * MOTION_SIZE[0] * MOTION_SIZE[1]  # ~2 gray levels per pixel on average
+MAX_SKIPPED_FRAMES = 10  # always re-run detection after this many skipped frames
 
 # Finger tip IDs in Mediapipe
 FINGER_TIPS = [4, 8, 12, 16, 20]
+# Joint each tip is compared against: thumb IP, then the PIP of the other fingers
+FINGER_JOINTS = [3, 6, 10, 14, 18]
 
-def fingers_up(hand_landmarks):
+def landmarks_to_array(hand_landmarks):
     """
-    Returns list of 0/1 for fingers (thumb to pinky) indicating if finger is up (1) or down (0).
-    Thumb comparison depends on handedness.
+    Returns a (21, 2) float32 array of the normalized (x, y) landmark coordinates.
     """
-    fingers = []
+    return np.fromiter(
+        (v for p in hand_landmarks.landmark for v in (p.x, p.y)),
+        dtype=np.float32,
+        count=42,
+    ).reshape(21, 2)
 
-    # Thumb: Check if tip is to the left or right of the IP joint
-    # Mediapipe landmarks: thumb_tip=4, thumb_ip=3
-    # For right hand, tip.x < ip.x means thumb is open
-    if hand_landmarks.landmark[FINGER_TIPS[0]].x < hand_landmarks.landmark[FINGER_TIPS[0] - 1].x:
-        fingers.append(1)
-    else:
-        fingers.append(0)
+def fingers_up(lm):
+    """
+    Returns int8 array of 0/1 for fingers (thumb to pinky) indicating if finger is up (1) or down (0).
+    Takes the (21, 2) array from landmarks_to_array.
+    Thumb comparison depends on handedness.
+    """
+    tips = lm[FINGER_TIPS]
+    joints = lm[FINGER_JOINTS]
+    fingers = np.empty(5, dtype=np.int8)
 
+    # Thumb: for right hand, tip.x < ip.x means thumb is open
+    fingers[0] = tips[0, 0] < joints[0, 0]
     # Other fingers: tip.y < pip.y means finger is up
-    for i in range(1, 5):
-        if hand_landmarks.landmark[FINGER_TIPS[i]].y < hand_landmarks.landmark[FINGER_TIPS[i] - 2].y:
-            fingers.append(1)
-        else:
-            fingers.append(0)
+    fingers[1:] = tips[1:, 1] < joints[1:, 1]
     return fingers
 
+# Bit weight of each finger when packing: thumb is the high bit, pinky the low bit
+FINGER_BITS = np.array([16, 8, 4, 2, 1], dtype=np.int8)
+
+def fingers_mask(fingers):
+    """
+    Packs the fingers array into a 5-bit int, e.g. [1, 0, 0, 0, 0] -> 0b10000.
+    """
+    return int(fingers @ FINGER_BITS)
+
+# (K, 2) landmark index pairs for the hand skeleton
+HAND_CONNECTIONS = np.array(sorted(mp_hands.HAND_CONNECTIONS), dtype=np.int32)
+
+def draw_hand(frame, lm):
+    """
+    Draws the hand skeleton with one polylines call plus a dot per landmark.
+    Takes the (21, 2) array from landmarks_to_array.
+    """
+    h, w = frame.shape[:2]
+    pts = (lm * np.array([w, h], dtype=np.float32)).astype(np.int32)
+    cv2.polylines(frame, pts[HAND_CONNECTIONS], False, (0, 255, 0), 2)
+    for x, y in pts:
+        cv2.circle(frame, (int(x), int(y)), 3, (0, 0, 255), -1)
+
 # Detect swipe using movement vector and speed
 class SwipeDetector:
-    def __init__(self, threshold=0.15, time_window=0.5):
+    def __init__(self, threshold=0.15, time_window=0.5, max_samples=32):
         self.threshold = threshold
         self.time_window = time_window
-        self.positions = []
-        self.times = []
+        # Bounded deques: O(1) eviction from the left, oldest samples drop automatically
+        self.positions = deque(maxlen=max_samples)
+        self.times = deque(maxlen=max_samples)
 
-    def update(self, x_pos):
-        current_time = time.time()
+    def update(self, x_pos, current_time):
+        """Adds a sample taken at current_time (time.monotonic()) and returns "left", "right" or None."""
         self.positions.append(x_pos)
         self.times.append(current_time)
 
         # Remove old points beyond time window
         while self.times and (current_time - self.times[0]) > self.time_window:
-            self.times.pop(0)
-            self.positions.pop(0)
+            self.times.popleft()
+            self.positions.popleft()
 
         if len(self.positions) < 2:
             return None
@@ -151,80 +218,201 @@ class SwipeDetector:
         else:
             return None
 
+# --- Threaded Frame Capture ---
+
+class FrameReader:
+    """
+    Grabs webcam frames on a background thread so the driver buffer never
+    fills up with stale frames while the main thread is busy.
+    Every frame is grabbed, but only the one grabbed after read() asks for a
+    frame is decoded (retrieved), so the main thread always gets a fresh
+    frame and skipped frames cost no decoding.
+    """
+    def __init__(self, cap):
+        self.cap = cap
+        self.frames = queue.Queue(maxsize=1)
+        self.wanted = threading.Event()  # set while read() is waiting for a frame
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            while not self.stopped:
+                if not self.cap.grab():
+                    break
+                grab_time = time.monotonic()
+                if not self.wanted.is_set():
+                    continue  # nobody waiting; keep draining the driver buffer
+
+                ret, frame = self.cap.retrieve()
+                if not ret:
+                    break
+                self.wanted.clear()
+                self.frames.put((frame, grab_time))
+        finally:
+            # Always wake up read(), also when grab/retrieve raised.
+            # Drop a frame that will never be read to make room for the sentinel.
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.frames.put(None)
+
+    def read(self):
+        """
+        Returns (frame, grab timestamp) for the first frame grabbed after this call,
+        or None if capture failed.
+        """
+        self.wanted.set()
+        return self.frames.get()
+
+    def stop(self):
+        # Wait for the thread to leave cap.grab() before the capture is released
+        self.stopped = True
+        self.thread.join()
+
+class HudOverlay:
+    """
+    Status/gesture text strip drawn at the top of the frame.
+    The text is rasterized once per change and copied onto each frame.
+    """
+    HEIGHT = 70  # rows covered by the two text lines
+
+    def __init__(self):
+        self._key = None
+        self._img = None
+        self._mask = None
+
+    def _build(self, width, status_text, gesture_text):
+        self._img = np.zeros((self.HEIGHT, width, 3), dtype=np.uint8)
+        cv2.putText(self._img, status_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+        if gesture_text:
+            cv2.putText(self._img, f"Gesture: {gesture_text}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+        # Text colors are never black, so any non-zero pixel is text
+        self._mask = self._img.any(axis=2, keepdims=True)
+
+    def draw(self, frame, status_text, gesture_text):
+        key = (frame.shape[1], status_text, gesture_text)
+        if key != self._key:
+            self._build(frame.shape[1], status_text, gesture_text)
+            self._key = key
+        np.copyto(frame[:self.HEIGHT], self._img, where=self._mask)
+
+def render(frame, hud, status_text, gesture_text):
+    """Draws the status overlay and shows the frame. Returns the pressed key."""
+    hud.draw(frame, status_text, gesture_text)
+    cv2.imshow("Gesture Controlled Media Player", frame)
+    return cv2.waitKey(1)
+
 # --- Main Application ---
 
 def main():
     cap = cv2.VideoCapture(0)
-    mp_hands = mp.solutions.hands
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # keep driver-side buffering to one frame
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAPTURE_SIZE[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAPTURE_SIZE[1])
+    reader = FrameReader(cap).start()
 
     player = MediaPlayer(media_files)
     swipe_detector = SwipeDetector()
+    hud = HudOverlay()
+
+    # Finger bitmask (thumb..pinky) -> (label, action)
+    gestures = {
+        0b11111: ("Play/Pause", player.play_pause),    # All fingers up
+        0b10000: ("Volume Up", player.volume_up),      # Thumb only up
+        0b00000: ("Volume Down", player.volume_down),  # All fingers down
+        0b01000: ("Mute/Unmute", player.mute_unmute),  # Index finger only up
+        0b00001: ("Stop", player.stop),                # Pinky only up
+    }
 
     gesture_cooldown = 1.2  # seconds between recognized gestures
-    last_gesture_time = 0
+    last_gesture_time = -gesture_cooldown  # monotonic clock; allow a gesture right away
+
+    prev_small = None
+    last_results = None
+    skipped_frames = 0
+
+    # Reused per-frame buffers (small_buf/rgb_buf only on the CPU path); the
+    # full-size one is allocated once the frame size is known
+    frame_buf = None
+    small_buf = np.empty((DETECTION_SIZE[1], DETECTION_SIZE[0], 3), dtype=np.uint8)
+    rgb_buf = np.empty_like(small_buf)
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        item = reader.read()
+        if item is None:
             print("Failed to capture frame")
             break
+        raw_frame, current_time = item  # monotonic capture time stamped by FrameReader
 
-        frame = cv2.flip(frame, 1)  # mirror image
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if frame_buf is None or frame_buf.shape != raw_frame.shape:
+            frame_buf = np.empty_like(raw_frame)
 
-        results = hands_detector.process(rgb_frame)
+        # Mirror the image on the CPU (the full frame is kept for display) and
+        # make a downscaled copy for detection
+        frame = cv2.flip(raw_frame, 1, dst=frame_buf)
+        if USE_OPENCL:
+            small_frame = cv2.resize(cv2.UMat(frame), DETECTION_SIZE, interpolation=cv2.INTER_AREA)
+        else:
+            small_frame = cv2.resize(frame, DETECTION_SIZE, dst=small_buf, interpolation=cv2.INTER_AREA)
+
+        # Reuse the previous landmarks when nothing moved
+        # (sumElems works on both numpy arrays and UMats)
+        small = cv2.resize(cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY), MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        still = (
+            prev_small is not None
+            and cv2.sumElems(cv2.absdiff(prev_small, small))[0] < MOTION_THRESHOLD
+        )
+        prev_small = small
+
+        if still and last_results is not None and skipped_frames < MAX_SKIPPED_FRAMES:
+            results = last_results
+            skipped_frames += 1
+        else:
+            if USE_OPENCL:
+                rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB).get()
+            else:
+                rgb_buf.flags.writeable = True
+                rgb_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+            # Read-only input lets MediaPipe use the buffer without copying it
+            rgb_frame.flags.writeable = False
+            results = hands_detector.process(rgb_frame)
+            last_results = results
+            skipped_frames = 0
 
-        h, w, _ = frame.shape
         gesture_text = ""
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+                # Convert landmarks once; drawing, fingers and hand center all reuse it
+                lm = landmarks_to_array(hand_landmarks)
+                draw_hand(frame, lm)
 
-                # Get fingers status
-                fingers = fingers_up(hand_landmarks)
+                # Get fingers status, packed as a thumb..pinky bitmask
+                fingers = fingers_up(lm)
+                mask = fingers_mask(fingers)
                 # Calculate hand center x coordinate (average x of all landmarks)
-                hand_center_x = np.mean([lm.x for lm in hand_landmarks.landmark])
+                hand_center_x = lm[:, 0].mean()
 
-                current_time = time.time()
                 time_since_last = current_time - last_gesture_time
 
                 # Check cooldown to avoid rapid multiple triggers
                 if time_since_last > gesture_cooldown:
-                    # Gesture recognition rules:
-
-                    # All fingers up = play/pause toggle
-                    if fingers == [1, 1, 1, 1, 1]:
-                        player.play_pause()
-                        gesture_text = "Play/Pause"
+                    # Gesture recognition rules: look up the packed finger state
+                    gesture = gestures.get(mask)
+                    if gesture is not None:
+                        gesture_text, action = gesture
+                        action()
                         last_gesture_time = current_time
-
-                    # Thumb only up = volume up
-                    elif fingers == [1, 0, 0, 0, 0]:
-                        player.volume_up()
-                        gesture_text = "Volume Up"
-                        last_gesture_time = current_time
-
-                    # Thumb down (all fingers down) = volume down
-                    elif fingers == [0, 0, 0, 0, 0]:
-                        player.volume_down()
-                        gesture_text = "Volume Down"
-                        last_gesture_time = current_time
-
-                    # Index finger only up = mute/unmute toggle
-                    elif fingers == [0, 1, 0, 0, 0]:
-                        player.mute_unmute()
-                        gesture_text = "Mute/Unmute"
-                        last_gesture_time = current_time
-
-                    # Fist (all fingers down) = stop playback
-                    elif fingers == [0, 0, 0, 0, 0]:
-                        player.stop()
-                        gesture_text = "Stop"
-                        last_gesture_time = current_time
-
                     else:
                         # Detect swipe gestures
-                        swipe = swipe_detector.update(hand_center_x)
+                        swipe = swipe_detector.update(hand_center_x, current_time)
                         if swipe == "left":
                             player.prev_track()
                             gesture_text = "Previous Track"
@@ -235,7 +423,7 @@ def main():
                             last_gesture_time = current_time
                 else:
                     # Continue updating swipe detector to keep history fresh
-                    swipe_detector.update(hand_center_x)
+                    swipe_detector.update(hand_center_x, current_time)
 
         else:
             # No hands detected, reset swipe detector
@@ -243,18 +431,11 @@ def main():
             swipe_detector.times.clear()
 
         # Display UI info
-        status_text = player.get_status()
-        cv2.putText(frame, status_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-
-        if gesture_text:
-            cv2.putText(frame, f"Gesture: {gesture_text}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-
-        cv2.imshow("Gesture Controlled Media Player", frame)
-
-        key = cv2.waitKey(1)
+        key = render(frame, hud, player.get_status(), gesture_text)
         if key == 27:  # ESC key
             break
 
+    reader.stop()
     cap.release()
     cv2.destroyAllWindows()
     player.stop()
@@ -1,79 +1,153 @@
+import os
+
 import streamlit as st
+import streamlit.components.v1 as components
 import numpy as np
-import pandas as pd
-
-import heapq
-
-def get_neighbors(pos, grid):
-    i, j = pos
-    neighbors = []
-    for x, y in [(-1,0), (1,0), (0,-1), (0,1)]:
-        ni, nj = i + x, j + y
-        if 0 <= ni < grid.shape[0] and 0 <= nj < grid.shape[1]:
-            if grid[ni][nj] != -1:
-                neighbors.append((ni, nj))
-    return neighbors
-
-def reconstruct_path(came_from, current):
-    path = []
-    while current in came_from:
-        path.append(current)
-        current = came_from[current]
-    path.reverse()
+from numba import njit
+
+# Nodes are encoded as i * cols + j on the flattened grid.
+
+# Neighbor offsets: up, down, left, right
+DI = (-1, 1, 0, 0)
+DJ = (0, 0, -1, 1)
+INF = 2 ** 30
+
+def flatten_grid(grid):
+    """Returns the grid and its per-cell move costs as flat int32 arrays."""
+    grid_flat = grid.astype(np.int32).ravel()
+    costs = np.where(grid_flat == 5, 5, 1).astype(np.int32)
+    return grid_flat, costs
+
+# --- Numba search kernel (A* and UCS) ---
+
+@njit(cache=True)
+def _heap_push(keys, vals, size, key, val):
+    i = size
+    keys[i] = key
+    vals[i] = val
+    while i > 0:
+        parent = (i - 1) // 2
+        if keys[parent] <= keys[i]:
+            break
+        keys[parent], keys[i] = keys[i], keys[parent]
+        vals[parent], vals[i] = vals[i], vals[parent]
+        i = parent
+    return size + 1
+
+@njit(cache=True)
+def _heap_pop(keys, vals, size):
+    key = keys[0]
+    val = vals[0]
+    size -= 1
+    keys[0] = keys[size]
+    vals[0] = vals[size]
+    i = 0
+    while True:
+        smallest = i
+        left = 2 * i + 1
+        right = left + 1
+        if left < size and keys[left] < keys[smallest]:
+            smallest = left
+        if right < size and keys[right] < keys[smallest]:
+            smallest = right
+        if smallest == i:
+            break
+        keys[smallest], keys[i] = keys[i], keys[smallest]
+        vals[smallest], vals[i] = vals[i], vals[smallest]
+        i = smallest
+    return key, val, size
+
+@njit(cache=True)
+def _reconstruct_path_nb(came_from, current):
+    length = 0
+    node = current
+    while came_from[node] != -1:
+        length += 1
+        node = came_from[node]
+    path = np.empty(length, dtype=np.int32)
+    node = current
+    for k in range(length - 1, -1, -1):
+        path[k] = node
+        node = came_from[node]
     return path
 
-def ucs(grid, start, goal):
-    visited = set()
-    pq = [(0, start)]
-    came_from = {}
-
-    while pq:
-        cost, current = heapq.heappop(pq)
-
-        if current == goal:
-            return reconstruct_path(came_from, current)
-
-        if current in visited:
+@njit(cache=True)
+def search_nb(grid_flat, costs, rows, cols, start_id, goal_id, use_heuristic):
+    # A* with the Manhattan heuristic, or UCS when use_heuristic is False (h = 0)
+    hw = 1 if use_heuristic else 0
+    n = rows * cols
+    g_score = np.full(n, INF, dtype=np.int32)
+    came_from = np.full(n, -1, dtype=np.int32)
+    # Every push follows a g_score improvement, so 4 pushes per node is an upper bound
+    heap_keys = np.empty(4 * n + 1, dtype=np.int32)
+    heap_vals = np.empty(4 * n + 1, dtype=np.int32)
+
+    gi = goal_id // cols
+    gj = goal_id % cols
+    si = start_id // cols
+    sj = start_id % cols
+
+    g_score[start_id] = 0
+    size = _heap_push(heap_keys, heap_vals, 0, hw * (abs(si - gi) + abs(sj - gj)), start_id)
+
+    while size > 0:
+        f, current, size = _heap_pop(heap_keys, heap_vals, size)
+        if current == goal_id:
+            return _reconstruct_path_nb(came_from, current)
+
+        ci = current // cols
+        cj = current % cols
+        # Stale entry: current was re-pushed with a lower g after this one
+        if f > g_score[current] + hw * (abs(ci - gi) + abs(cj - gj)):
             continue
-        visited.add(current)
-
-        for neighbor in get_neighbors(current, grid):
-            if neighbor in visited:
+        for d in range(4):
+            ni = ci + DI[d]
+            nj = cj + DJ[d]
+            if ni < 0 or ni >= rows or nj < 0 or nj >= cols:
+                continue
+            neighbor = ni * cols + nj
+            if grid_flat[neighbor] == -1:
                 continue
 
-            ni, nj = neighbor
-            move_cost = 5 if grid[ni][nj] == 5 else 1
-            heapq.heappush(pq, (cost + move_cost, neighbor))
-
-            if neighbor not in came_from:
+            tentative_g = g_score[current] + costs[neighbor]
+            if tentative_g < g_score[neighbor]:
                 came_from[neighbor] = current
-
-    return []
-
-def heuristic(a, b):
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+                g_score[neighbor] = tentative_g
+                f = tentative_g + hw * (abs(ni - gi) + abs(nj - gj))
+                size = _heap_push(heap_keys, heap_vals, size, f, neighbor)
+    return np.empty(0, dtype=np.int32)
+
+def search(grid, start, goal, use_heuristic):
+    rows, cols = grid.shape
+    grid_flat, costs = flatten_grid(grid)
+    start_id = int(start[0]) * cols + int(start[1])
+    goal_id = int(goal[0]) * cols + int(goal[1])
+    if start_id == goal_id:
+        return [divmod(start_id, cols)]
+    path = search_nb(grid_flat, costs, rows, cols, start_id, goal_id, use_heuristic)
+    return [divmod(int(nid), cols) for nid in path]
 
 def a_star(grid, start, goal):
-    open_set = [(heuristic(start, goal), 0, start)]
-    came_from = {}
-    g_score = {start: 0}
+    return search(grid, start, goal, True)
 
-    while open_set:
-        _, cost, current = heapq.heappop(open_set)
-        if current == goal:
-            return reconstruct_path(came_from, current)
+def ucs(grid, start, goal):
+    return search(grid, start, goal, False)
 
-        for neighbor in get_neighbors(current, grid):
-            ni, nj = neighbor
-            move_cost = 5 if grid[ni][nj] == 5 else 1
-            tentative_g = g_score[current] + move_cost
+# Memoized search: repeat clicks on an unchanged grid skip the search entirely.
+# st.cache_data (not functools.lru_cache) because the script re-executes on every rerun.
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_path(grid_bytes, shape, dtype, start, goal, algo):
+    grid = np.frombuffer(grid_bytes, dtype=dtype).reshape(shape)
+    search = a_star if algo == "A*" else ucs
+    return search(grid, start, goal)
 
-            if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g
-                f = tentative_g + heuristic(neighbor, goal)
-                heapq.heappush(open_set, (f, tentative_g, neighbor))
-    return []
+def find_path(grid, start, goal, algo):
+    start = (int(start[0]), int(start[1]))
+    goal = (int(goal[0]), int(goal[1]))
+    # Drawn path cells (3) cost the same as free cells, so map them back to 0;
+    # otherwise the first search would change the key for every later click.
+    layout = np.where(grid == 3, 0, grid)
+    return cached_path(layout.tobytes(), layout.shape, layout.dtype.str, start, goal, algo)
 
 
 st.set_page_config(page_title="Pathfinding Grid", layout="wide")
@@ -95,20 +169,17 @@ if "grid_shape" not in st.session_state or st.session_state.grid_shape != (num_r
 if "mode" not in st.session_state:
     st.session_state.mode = "Start"
 
-# Color mapping: 0-free, 1-start, 2-goal, -1-obstacle
-def cell_color(val):
-    if val == 1:
-        return "background-color: orange"  # Start
-    elif val == 2:
-        return "background-color: darkgreen"  # Goal
-    elif val == -1:
-        return "background-color: black"  # Obstacle
-    elif val == 5:
-        return "background-color: brown"  # Slow terrain
-    elif val == 3:
-        return "background-color: violet"  # Path
-    else:
-        return "background-color: aqua"  # Free space
+# Color mapping, indexed by grid value + 1: -1-obstacle, 0-free, 1-start, 2-goal, 3-path, 5-slow terrain
+PALETTE = np.array([
+    [0, 0, 0],        # Obstacle
+    [0, 255, 255],    # Free space (aqua)
+    [255, 165, 0],    # Start (orange)
+    [0, 100, 0],      # Goal (darkgreen)
+    [238, 130, 238],  # Path (violet)
+    [0, 255, 255],    # (unused value 4)
+    [165, 42, 42],    # Slow terrain (brown)
+], dtype=np.uint8)
+CELL_PX = 20  # pixels per cell in the preview image
 
 
 # Select mode
@@ -150,25 +221,31 @@ def click_cell(i, j):
             st.session_state.goal_set = False
         grid[i][j] = 0
 
-# Display grid with interactive buttons
-for i in range(num_rows):
-    cols = st.columns(num_cols)
-    for j in range(num_cols):
-        label = ""
-        val = st.session_state.grid[i][j]
-        if val == 1:
-            label = "S"
-        elif val == 2:
-            label = "G"
-        elif val == -1:
-            label = "O"
-        elif val == 5:
-            label = "T"  # T for Terrain
-        cols[j].button(label, key=f"{i}-{j}", on_click=click_cell, args=(i, j))
-
-# Show styled dataframe
-styled_df = pd.DataFrame(st.session_state.grid)
-st.dataframe(styled_df.style.applymap(cell_color), use_container_width=True)
+# Display grid as a single canvas; it returns the last clicked cell
+grid_canvas = components.declare_component(
+    "grid_canvas", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "grid_canvas")
+)
+
+# Apply the click in the component's on_change callback: callbacks run before the
+# (fragment or full) rerun, so the grid drawn in that run already includes the click.
+# Each click carries a fresh nonce, so the value always changes.
+def on_grid_click():
+    click = st.session_state.grid_canvas
+    if click is not None:
+        click_cell(click["i"], click["j"])
+
+# Only this fragment reruns on a grid click; the action buttons and path result
+# below are left alone until a full rerun.
+@st.fragment
+def render_grid():
+    grid_canvas(grid=st.session_state.grid.tolist(), key="grid_canvas", default=None, on_change=on_grid_click)
+
+    # Show colored grid preview (one vectorized palette lookup instead of per-cell styling)
+    img = PALETTE[st.session_state.grid + 1]
+    img = img.repeat(CELL_PX, axis=0).repeat(CELL_PX, axis=1)
+    st.image(img)
+
+render_grid()
 
 # 🧠 Detect Start and Goal
 grid = st.session_state.grid
@@ -192,7 +269,7 @@ spacer, col1, col2, col3 = st.columns([1, 2, 2, 2], gap="large")
 with col1:
     if st.button("A*", key="a_star_button"):
         if start and goal:
-            path = a_star(grid.copy(), start, goal)
+            path = find_path(grid, start, goal, "A*")
             for cell in path:
                 if grid[cell] == 0:
                     grid[cell] = 3
@@ -214,7 +291,7 @@ with col2:
 with col3:
     if st.button("UCS", key="ucs_button"):
         if start and goal:
-            path = ucs(grid.copy(), start, goal)
+            path = find_path(grid, start, goal, "UCS")
             for cell in path:
                 if grid[cell] == 0:
                     grid[cell] = 3